@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -125,3 +126,26 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CSRF_TRUSTED_ORIGINS = ["http://localhost:8000", "http://127.0.0.1:8000", "https://05b4afd451b1.ngrok-free.app"]
 CORS_ORIGIN_ALLOW_ALL = True
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'jovian': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# Prewarm the Chroma vectorstore when the app loads. Set JOVIAN_WARM_VECTORSTORE=1
+# for WSGI/ASGI servers (gunicorn, uvicorn); `runserver` always warms its serving process.
+JOVIAN_WARM_VECTORSTORE = os.environ.get("JOVIAN_WARM_VECTORSTORE") == "1"
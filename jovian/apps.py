@@ -1,4 +1,12 @@
+import os
+import sys
+import logging
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class JovianConfig(AppConfig):
@@ -7,3 +15,26 @@ class JovianConfig(AppConfig):
 
     def ready(self):
         print("🔥 Jovian APP LOADED")
+
+        if self._should_warm_vectorstore():
+            threading.Thread(target=self._warm_vectorstore, name="vectorstore-warmup", daemon=True).start()
+
+    @staticmethod
+    def _should_warm_vectorstore() -> bool:
+        """Warm only serving processes - never migrate/shell/test runs"""
+        if getattr(settings, "JOVIAN_WARM_VECTORSTORE", False):
+            return True
+        # runserver: only the process that serves (autoreloader child, or --noreload)
+        return sys.argv[1:2] == ["runserver"] and (
+            os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+        )
+
+    @staticmethod
+    def _warm_vectorstore():
+        from .services.supervisor import warm_vectorstore
+
+        try:
+            warm_vectorstore()
+            logger.info("Vectorstore warmed")
+        except Exception:
+            logger.warning("Vectorstore warmup failed", exc_info=True)
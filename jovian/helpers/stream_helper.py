@@ -1,19 +1,22 @@
-import json
 import time
+import logging
+import orjson
 import traceback
 from typing import Dict, Any, Generator, AnyStr
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage, BaseMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage, BaseMessage
+
+logger = logging.getLogger(__name__)
 
 def stream_generator(
     agent,
     agent_input: Dict[str, Any],
     config: Dict[str, Any],
-) -> Generator[str, None, None]:
+) -> Generator[bytes, None, None]:
     """
     🚀 PRODUCTION-READY LangGraph Streaming (SSE format)
     
     Emits SSE events:
-    - token: Individual tokens (real-time typing effect)
+    - token: Individual LLM tokens as they are generated
     - node: Node transitions (rag_executor, intent_classifier, etc.)
     - message: Complete AI response
     - tool: Tool calls executed
@@ -21,30 +24,56 @@ def stream_generator(
     - error: Detailed error info
     """
     
-    def emit_sse(obj: Dict[str, Any]) -> str:
-        """Format Server-Sent Events (SSE)"""
-        return f"data: {json.dumps(obj, ensure_ascii=False)}\n\n"
+    def emit_sse(obj: Dict[str, Any]) -> bytes:
+        """Format Server-Sent Events (SSE) as UTF-8 bytes"""
+        return b"data: " + orjson.dumps(obj) + b"\n\n"
     
     stream_id = f"stream-{int(time.time())}"
     token_usage = {"input": 0, "output": 0, "total": 0}
     
     try:
-        print(f"[STREAM] Starting execution - Stream ID: {stream_id}")
+        logger.debug("[STREAM] Starting execution - Stream ID: %s", stream_id)
         
         # ============================================
         # 1. TOKEN-BY-TOKEN STREAMING (BEST UX)
         # ============================================
-        for chunk in agent.stream(
+        tokens_so_far = 0
+        for namespace, mode, payload in agent.stream(
             agent_input, 
             config=config, 
-            stream_mode="updates",  # ✅ Node-by-node updates
+            stream_mode=["updates", "messages"],  # ✅ Node updates + real LLM tokens
+            subgraphs=True,  # ✅ general_message runs the message agent as a nested graph
             stream_options={"include_names": ["general_message"]}  # ✅ Only stream final response
         ):
+            # ============================================
+            # 2. REAL LLM TOKENS FROM general_message
+            # ============================================
+            if mode == "messages":
+                message_chunk, _metadata = payload
+                # Skip classifier / multi-query LLM calls - only the reply is streamed
+                if not namespace or not namespace[0].startswith("general_message"):
+                    continue
+                if isinstance(message_chunk, AIMessageChunk) and message_chunk.content:
+                    tokens_so_far += len(message_chunk.content)
+                    yield emit_sse({
+                        "type": "token",
+                        "stream_id": stream_id,
+                        "node": "general_message",
+                        "content": message_chunk.content,
+                        "tokens_so_far": tokens_so_far,
+                        "timestamp": time.time()
+                    })
+                continue
+
+            # Node transitions of nested agents are internal details
+            if namespace:
+                continue
+
             # Parse chunk structure: {"node_name": state_update}
-            node_name = list(chunk.keys())[0]
-            node_update = chunk[node_name]
+            node_name = next(iter(payload))
+            node_update = payload[node_name]
             
-            print(f"[STREAM] Node: {node_name}")
+            logger.debug("[STREAM] Node: %s", node_name)
             
             # Emit node transition
             yield emit_sse({
@@ -54,35 +83,29 @@ def stream_generator(
                 "timestamp": time.time()
             })
             
-            # ============================================
-            # 2. HANDLE AI MESSAGE STREAMING
-            # ============================================
             if node_name == "general_message" and "messages" in node_update:
                 messages = node_update["messages"]
                 if isinstance(messages, list) and len(messages) > 0:
                     last_msg = messages[-1]
                     
                     if isinstance(last_msg, AIMessage) and last_msg.content:
-                        # Stream content token-by-token (simulate)
-                        content = last_msg.content
-                        for i in range(0, len(content), 10):  # Chunk by ~10 chars
-                            token_chunk = content[i:i+10]
+                        # Reply produced without an LLM stream (e.g. error message)
+                        if tokens_so_far == 0:
                             yield emit_sse({
                                 "type": "token",
                                 "stream_id": stream_id,
                                 "node": node_name,
-                                "content": token_chunk,
-                                "tokens_so_far": i + len(token_chunk),
+                                "content": last_msg.content,
+                                "tokens_so_far": len(last_msg.content),
                                 "timestamp": time.time()
                             })
-                            time.sleep(0.05)  # Realistic typing speed
-                        
+
                         # Complete message
                         yield emit_sse({
                             "type": "message",
                             "stream_id": stream_id,
                             "node": node_name,
-                            "content": content,
+                            "content": last_msg.content,
                             "complete": True
                         })
             
@@ -121,8 +144,7 @@ def stream_generator(
     except Exception as e:
         error_msg = f"Stream error: {str(e)}"
         error_detail = traceback.format_exc()
-        print(f"[ERROR] {error_msg}")
-        print(error_detail)
+        logger.error("[ERROR] %s\n%s", error_msg, error_detail)
         
         yield emit_sse({
             "type": "error",
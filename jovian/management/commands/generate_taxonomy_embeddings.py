@@ -1,15 +1,25 @@
 import re
 import json
+import asyncio
+import hashlib
+import textwrap
 import traceback
-from typing import List, Dict, Any, Set
-from datetime import datetime
+import httpx
+import ijson
+from typing import List, Dict, Any, Set, Callable, Iterable
+from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from langchain_core.documents import Document
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
 
+import chromadb
 from langchain_chroma import Chroma
+from langchain_classic.embeddings import CacheBackedEmbeddings
+from langchain_classic.storage import LocalFileStore
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 
 load_dotenv()
@@ -18,14 +28,128 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 CHROMA_DB_PATH = BASE_DIR / "jovian/chroma_db"
 JSON_FILE = BASE_DIR / "advanced_portfolio_data.json"
 COLLECTION_NAME = "project_portfolio"
+LLM_CONCURRENCY = 5  # Max in-flight taxonomy LLM calls (OpenAI rate limits)
+TAXONOMY_CACHE_FILE = BASE_DIR / "jovian/.taxonomy_cache.json"
+TAXONOMY_CACHE_TTL = timedelta(days=7)
+TAXONOMY_LLM_MODEL = "gpt-4o-mini"
+PROMPT_EXCLUDED_KEYS = frozenset({"source"})  # Provenance URLs - never used as evidence
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_CACHE_PATH = BASE_DIR / ".cache/embeddings"
+
+# ✅ HTTP/2 pool sized for the concurrent taxonomy calls
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+HTTP_TIMEOUT = 60
+
+
+class TaxonomyMeta(BaseModel):
+    """Metadata the LLM extracts for one taxonomy chunk"""
+    category: str
+    sub_type: str
+    keywords: List[str]
+    project_ref: str
+
+
+class TaxonomyChunk(BaseModel):
+    """One taxonomy paragraph + metadata - enforced as the LLM output schema"""
+    content: str
+    metadata: TaxonomyMeta
+
+
+def build_structured_llm(http_async_client: httpx.AsyncClient):
+    """Taxonomy LLM bound to the event loop's HTTP client"""
+    llm = ChatOpenAI(model=TAXONOMY_LLM_MODEL, temperature=0, http_async_client=http_async_client)
+    # ✅ Schema-enforced JSON output; include_raw keeps usage metadata available
+    return llm.with_structured_output(TaxonomyChunk, include_raw=True)
+
+
+# ✅ Persistent SHA-256 keyed cache: unchanged chunks are not re-embedded on re-runs
+embeddings = CacheBackedEmbeddings.from_bytes_store(
+    OpenAIEmbeddings(model=EMBEDDING_MODEL, chunk_size=2048),  # ✅ Max inputs per request
+    LocalFileStore(str(EMBEDDING_CACHE_PATH)),
+    namespace=EMBEDDING_MODEL,
+    key_encoder="sha256",
+)
+
+# ✅ One Chroma client per process - opens the SQLite store once
+chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+
+# ✅ HNSW tuned for a small taxonomy collection (applied when the collection is created)
+HNSW_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 100,
+    "hnsw:M": 16,
+}
+
+# ✅ Compiled once at import. Invariant prefix first (persona + PROJECT JSON) so
+# OpenAI prompt caching can reuse it across the 5 category calls.
+TAXONOMY_PROMPT_TEMPLATE = textwrap.dedent("""
+    You are analyzing Brihaspati Infotech's project portfolio.
+
+    **PROJECT JSON:**
+    {project_json_str}
+
+    **CATEGORY:** {category_name}
+    **CATEGORY PURPOSE:** {purpose}
+    **KEYWORD TRIGGERS:** {keywords_joined}
+    **EVIDENCE TYPE:** {evidence}
+
+    **TASK:** Extract ONE paragraph from the PROJECT JSON above that BEST demonstrates this capability.
+    - Use ONLY facts from the JSON
+    - Reference specific project names & technologies
+    - Keep concise (100-200 words)
+    - Make it query-answer ready
+
+    **OUTPUT JSON ONLY:**
+    {{
+        "content": "Your extracted paragraph here",
+        "metadata": {{
+            "category": "{category_name}",
+            "sub_type": "Extract from JSON",
+            "keywords": ["list", "3-5", "exact", "phrases"],
+            "project_ref": "Specific project name"
+        }}
+    }}
+    """)
+
+# ✅ Cached generations are only valid for the prompt + output schema + model
+# that produced them - any change to those invalidates the cache automatically
+TAXONOMY_CACHE_VERSION = hashlib.sha256(
+    "\0".join([
+        TAXONOMY_PROMPT_TEMPLATE,
+        json.dumps(TaxonomyChunk.model_json_schema(), sort_keys=True),
+        TAXONOMY_LLM_MODEL,
+    ]).encode("utf-8")
+).hexdigest()[:16]
+
+# ✅ CHROMA SAFE: fixed metadata schema of taxonomy documents (field -> primitive type)
+TAXONOMY_METADATA_SCHEMA: Dict[str, type] = {
+    "category": str,
+    "sub_type": str,
+    "keywords": str,
+    "project_ref": str,
+    "evidence_type": str,
+    "chunk_id": int,
+    "taxonomy_score": float,
+    "created_at": str,
+    "source": str,
+}
+
+
+def _make_flattener(schema: Dict[str, type]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Build a metadata flattener specialized to a known schema - no per-value type dispatch"""
+    fields = tuple(schema.items())
+
+    def flatten(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: coerce(metadata[key]) for key, coerce in fields}
+
+    return flatten
 
-# ✅ Global LLM and embeddings
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
 
 class Command(BaseCommand):
     help = 'Generate 5 Master Taxonomy embeddings from portfolio JSON'
     
+    _flatten_taxonomy_metadata = staticmethod(_make_flattener(TAXONOMY_METADATA_SCHEMA))
+
     MASTER_TAXONOMY = {
         "Technical_Capability": {
             "purpose": "Do you know X? How do you build Y?",
@@ -59,65 +183,93 @@ class Command(BaseCommand):
         }
     }
 
-    def _chroma_safe_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """✅ CHROMA SAFE: Convert ALL values to primitives (str/int/float/bool/None)"""
-        safe = {}
-        for key, value in metadata.items():
-            if value is None:
-                safe[key] = None
-            elif isinstance(value, (str, int, float, bool)):
-                safe[key] = value
-            elif isinstance(value, list):
-                # ✅ Convert lists to comma-separated strings
-                safe[key] = ", ".join(str(item) for item in value[:10])  # Max 10 items
-            elif isinstance(value, dict):
-                # ✅ Flatten nested dicts
-                safe[key] = json.dumps(value, default=str)[:500]  # Max 500 chars
-            else:
-                safe[key] = str(value)[:500]  # Everything else to string
-        return safe
+    # ✅ Static keyword lists are joined once, when the class is defined
+    MASTER_KEYWORDS_JOINED = {
+        category_name: ", ".join(category_info["keywords"])
+        for category_name, category_info in MASTER_TAXONOMY.items()
+    }
+
+    def _load_taxonomy_cache(self) -> Dict[str, Any]:
+        """Load cached LLM taxonomy generations, dropping expired entries"""
+        try:
+            with open(TAXONOMY_CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        
+        now = datetime.now().isoformat()
+        return {key: entry for key, entry in cache.items() if entry.get("expires_at", "") > now}
+
+    def _save_taxonomy_cache(self, cache: Dict[str, Any]) -> None:
+        """Persist LLM taxonomy generations for the next run"""
+        with open(TAXONOMY_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+
+    async def _generate_category(
+        self,
+        category_name: str,
+        category_info: Dict[str, Any],
+        project_json_str: str,
+        semaphore: asyncio.Semaphore,
+        cache_key: str,
+    ) -> Dict[str, Any]:
+        """Generate the taxonomy chunk for a single Master Taxonomy category"""
+        # ✅ Same portfolio JSON + category + prompt version → reuse previous generation
+        cached = self.taxonomy_cache.get(cache_key)
+        if cached:
+            return cached["chunk"]
 
-    def build_taxonomy_chunks_from_project_json(self, project_json: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate EXACTLY 5 taxonomy chunks - one per Master Taxonomy category"""
+        prompt = TAXONOMY_PROMPT_TEMPLATE.format(
+            project_json_str=project_json_str,
+            category_name=category_name,
+            purpose=category_info["purpose"],
+            keywords_joined=self.MASTER_KEYWORDS_JOINED[category_name],
+            evidence=category_info["evidence"],
+        )
+
+        async with semaphore:
+            response = await self.structured_llm.ainvoke(prompt)
+        if response["parsed"] is None:
+            raise response["parsing_error"] or ValueError("LLM returned no taxonomy chunk")
+        raw = response["raw"]
+        cached_tokens = (raw.usage_metadata or {}).get("input_token_details", {}).get("cache_read", 0)
+        self.stdout.write(f"  🧮 {category_name}: {cached_tokens} cached prompt tokens")
+        chunk = response["parsed"].model_dump()
+
+        self.taxonomy_cache[cache_key] = {
+            "chunk": chunk,
+            "expires_at": (datetime.now() + TAXONOMY_CACHE_TTL).isoformat(),
+        }
+        return chunk
+
+    async def build_taxonomy_chunks_from_project_json(self, project_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Generate EXACTLY 5 taxonomy chunks - one per Master Taxonomy category, fetched concurrently"""
         self.stdout.write(self.style.SUCCESS("🤖 Generating LLM Taxonomy chunks..."))
+        semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+        portfolio_hash = hashlib.sha256(
+            json.dumps(project_json, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        # ✅ Serialize once for all 5 prompts - compact JSON, fewer prompt tokens
+        project_json_str = json.dumps(project_json, ensure_ascii=False, separators=(",", ":"))
+
+        results = await asyncio.gather(
+            *(
+                self._generate_category(
+                    category_name,
+                    category_info,
+                    project_json_str,
+                    semaphore,
+                    cache_key=f"{portfolio_hash}:{category_name}:{TAXONOMY_CACHE_VERSION}",
+                )
+                for category_name, category_info in self.MASTER_TAXONOMY.items()
+            ),
+            return_exceptions=True,
+        )
+
         all_chunks = []
-        
-        for category_name, category_info in self.MASTER_TAXONOMY.items():
-            prompt = f"""
-            You are analyzing Brihaspati Infotech's project portfolio for {category_name}.
-
-            **CATEGORY PURPOSE:** {category_info['purpose']}
-            **KEYWORD TRIGGERS:** {', '.join(category_info['keywords'])}
-            **EVIDENCE TYPE:** {category_info['evidence']}
-
-            **TASK:** Extract ONE paragraph from `project_json` that BEST demonstrates this capability.
-            - Use ONLY facts from the JSON
-            - Reference specific project names & technologies  
-            - Keep concise (100-200 words)
-            - Make it query-answer ready
-
-            **PROJECT JSON:**
-            {json.dumps(project_json, indent=2)}
-
-            **OUTPUT JSON ONLY:**
-            {{
-                "content": "Your extracted paragraph here",
-                "metadata": {{
-                    "category": "{category_name}",
-                    "sub_type": "Extract from JSON",
-                    "keywords": ["list", "3-5", "exact", "phrases"],
-                    "project_ref": "Specific project name"
-                }}
-            }}
-            """
-            
-            try:
-                response = llm.invoke(prompt)
-                chunk = json.loads(response.content.strip())
-                all_chunks.append(chunk)
-                self.stdout.write(f"  ✅ {category_name}")
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"  ⚠️ Failed {category_name}: {e}"))
+        for category_name, result in zip(self.MASTER_TAXONOMY, results):
+            if isinstance(result, Exception):
+                self.stdout.write(self.style.ERROR(f"  ⚠️ Failed {category_name}: {result}"))
                 all_chunks.append({
                     "content": f"No {category_name} evidence found in portfolio.",
                     "metadata": {
@@ -127,6 +279,9 @@ class Command(BaseCommand):
                         "project_ref": "N/A"
                     }
                 })
+            else:
+                all_chunks.append(result)
+                self.stdout.write(f"  ✅ {category_name}")
         
         return self.validate_taxonomy_chunks(all_chunks)
 
@@ -182,15 +337,16 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"✅ Validated {len(validated)} chunks across 5 categories"))
         return validated
 
-    def convert_to_documents(self, taxonomy_chunks: List[Dict[str, Any]]) -> List[Document]:
-        """Convert to CHROMA-SAFE LangChain Documents"""
+    def convert_to_documents(self, taxonomy_chunks: List[Dict[str, Any]], project_index: int) -> List[Document]:
+        """Convert to CHROMA-SAFE LangChain Documents with stable per-project ids"""
         documents = []
+        created_at = datetime.now().isoformat()
         
         for i, chunk in enumerate(taxonomy_chunks):
             metadata = chunk["metadata"]
             
             # ✅ CHROMA SAFE: ALL PRIMITIVES ONLY
-            safe_metadata = self._chroma_safe_metadata({
+            safe_metadata = self._flatten_taxonomy_metadata({
                 "category": metadata["category"],
                 "sub_type": metadata["sub_type"],
                 "keywords": metadata["keywords"],  # Already string
@@ -198,11 +354,12 @@ class Command(BaseCommand):
                 "evidence_type": metadata["evidence_type"],
                 "chunk_id": i,
                 "taxonomy_score": 1.0,
-                "created_at": str(datetime.now().isoformat()),
+                "created_at": created_at,
                 "source": "brihaspati_portfolio"
             })
             
             doc = Document(
+                id=f"taxonomy::{project_index}::{metadata['category']}",  # ✅ Stable upsert key
                 page_content=str(chunk["content"]),
                 metadata=safe_metadata
             )
@@ -224,8 +381,12 @@ class Command(BaseCommand):
         self.stdout.write(self.style.NOTICE("\n🔍 Testing retrieval by category:"))
         retriever = vectorstore.as_retriever(search_type="mmr", search_kwargs={"k": 2})
         
-        for category, query in test_queries.items():
-            docs = retriever.invoke(query)
+        # ✅ Chroma's client is sync; the GIL is released inside its native calls,
+        # so a small thread pool runs the probes concurrently without an event loop
+        with ThreadPoolExecutor(max_workers=len(test_queries)) as executor:
+            results = list(executor.map(retriever.invoke, test_queries.values()))
+        
+        for (category, query), docs in zip(test_queries.items(), results):
             cat_match = "✅" if any(d.metadata["category"] == category for d in docs) else "❌"
             self.stdout.write(f"{cat_match} {category:<25} | '{query[:40]}...' -> {len(docs)} docs")
 
@@ -244,25 +405,31 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"📊 Categories: {category_counts}"))
         
         try:
-            # 1. Delete existing collection
-            temp_vectorstore = Chroma(
-                collection_name=COLLECTION_NAME,
-                embedding_function=embeddings,
-                persist_directory=str(CHROMA_DB_PATH),
-            )
-            temp_vectorstore.delete_collection()
+            # 1. Embed ALL documents in one batched request
+            ids = [d.id for d in documents]
+            texts = [d.page_content for d in documents]
+            metadatas = [d.metadata for d in documents]
+            vectors = embeddings.embed_documents(texts)
 
-            # ✅ FIXED: Direct creation with delete_collection=True
-            vectorstore = Chroma.from_documents(
-                documents=documents,  # ✅ Flat list - CHROMA SAFE
-                embedding=embeddings,
+            # 2. Upsert in place - no collection rebuild
+            vectorstore = Chroma(
+                client=chroma_client,
                 collection_name=COLLECTION_NAME,
-                persist_directory=str(CHROMA_DB_PATH),
-                # ✅ This deletes existing collection automatically
+                embedding_function=embeddings,  # ✅ Query-time embedding only
+                collection_metadata=HNSW_COLLECTION_METADATA,
             )
-            
-            # ✅ Test retrieval immediately
-            self.test_retrieval_sample(vectorstore)
+            vectorstore._collection.upsert(
+                ids=ids,
+                embeddings=vectors,
+                documents=texts,
+                metadatas=metadatas,  # ✅ Flat list - CHROMA SAFE
+            )
+
+            # 3. Drop chunks of projects no longer in the portfolio
+            stale_ids = set(vectorstore._collection.get(include=[])["ids"]) - set(ids)
+            if stale_ids:
+                vectorstore._collection.delete(ids=list(stale_ids))
+                self.stdout.write(self.style.WARNING(f"🗑️ Removed {len(stale_ids)} stale documents"))
             
             self.stdout.write(
                 self.style.SUCCESS(f"\n✅ SUCCESS: {len(documents)} docs across 5 taxonomies!")
@@ -277,38 +444,80 @@ class Command(BaseCommand):
             traceback.print_exc()
             raise
 
+    def _trim_project(self, portfolio: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the project fields the taxonomy prompts can use"""
+        project = portfolio.get("project", {})
+        return {"project": {key: value for key, value in project.items() if key not in PROMPT_EXCLUDED_KEYS}}
+
+    async def generate_all_documents(self, portfolio_items: Iterable[Dict[str, Any]]) -> List[Document]:
+        """Generate taxonomy documents for every project as one flat list"""
+        self.taxonomy_cache = self._load_taxonomy_cache()
+        
+        # ✅ FIXED: Flatten all documents into single list
+        all_documents = []
+        
+        try:
+            # ✅ Client opened and closed inside the one event loop that uses it
+            async with httpx.AsyncClient(http2=True, limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT) as http_async_client:
+                self.structured_llm = build_structured_llm(http_async_client)
+                for i, portfolio in enumerate(portfolio_items):
+                    self.stdout.write(self.style.NOTICE(f"\n📂 Processing project {i+1}"))
+                
+                    # 2. GENERATE TAXONOMY (5 chunks per project)
+                    taxonomy_chunks = await self.build_taxonomy_chunks_from_project_json(portfolio)
+                
+                    # 3. VALIDATE & CONVERT TO DOCUMENTS
+                    project_docs = self.convert_to_documents(taxonomy_chunks, project_index=i)
+                
+                    # ✅ FIXED: Extend flat list (not append nested list)
+                    all_documents.extend(project_docs)
+                    self.stdout.write(self.style.SUCCESS(f"   Added {len(project_docs)} taxonomy docs"))
+        finally:
+            # ✅ Keep already-paid LLM generations even if parsing fails mid-file
+            try:
+                self._save_taxonomy_cache(self.taxonomy_cache)
+            except OSError as e:
+                self.stdout.write(self.style.WARNING(f"⚠️ Taxonomy cache write failed: {e}"))
+        
+        return all_documents
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Run sample retrieval queries against the vectorstore after upserting",
+        )
+
     def handle(self, *args, **options) -> None:
         """🚀 PRODUCTION PIPELINE: JSON → Taxonomy → Embeddings → Test - FIXED"""
         self.stdout.write(self.style.SUCCESS("🚀 Brihaspati Portfolio → Master Taxonomy Embeddings"))
         self.stdout.write(self.style.SUCCESS("=" * 60))
         
-        # 1. LOAD JSON
+        # 1. STREAM JSON - projects are parsed one at a time, never the whole file
+        self.stdout.write(self.style.NOTICE(f"Streaming JSON: {JSON_FILE}"))
         try:
-            self.stdout.write(self.style.NOTICE(f"Loading JSON: {JSON_FILE}"))
-            with open(JSON_FILE, "r", encoding="utf-8") as f:
-                portfolio_json = json.load(f)
-            self.stdout.write(self.style.SUCCESS(f"✅ Loaded: {JSON_FILE} ({len(portfolio_json)} projects)"))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"❌ JSON load failed: {e}"))
-            return
-        
-        # ✅ FIXED: Flatten all documents into single list
-        all_documents = []
-        
-        for i, portfolio in enumerate(portfolio_json):
-            self.stdout.write(self.style.NOTICE(f"\n📂 Processing project {i+1}/{len(portfolio_json)}"))
-            
-            # 2. GENERATE TAXONOMY (5 chunks per project)
-            taxonomy_chunks = self.build_taxonomy_chunks_from_project_json(portfolio)
-            
-            # 3. VALIDATE & CONVERT TO DOCUMENTS
-            project_docs = self.convert_to_documents(taxonomy_chunks)
+            f = open(JSON_FILE, "rb")
+        except OSError as e:
+            raise CommandError(f"❌ JSON load failed: {e}")
+
+        with f:
+            portfolio_items = (
+                self._trim_project(portfolio)
+                for portfolio in ijson.items(f, "item", use_float=True)
+            )
             
-            # ✅ FIXED: Extend flat list (not append nested list)
-            all_documents.extend(project_docs)
-            self.stdout.write(self.style.SUCCESS(f"   Added {len(project_docs)} taxonomy docs"))
+            # 2-3. GENERATE TAXONOMY & DOCUMENTS - one event loop for all projects
+            try:
+                all_documents = asyncio.run(self.generate_all_documents(portfolio_items))
+            except ijson.JSONError as e:
+                raise CommandError(f"❌ JSON parse failed: {e}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Generated {len(all_documents)} docs from {JSON_FILE}"))
         
         # 4. EMBED & STORE - Single flat list
-        self.upsert_documents_to_vectorstore(all_documents)
+        vectorstore = self.upsert_documents_to_vectorstore(all_documents)
+        
+        # 5. OPTIONAL RETRIEVAL CHECK
+        if options["verify"]:
+            self.test_retrieval_sample(vectorstore)
         
         self.stdout.write(self.style.SUCCESS("\n🎉 Master Taxonomy Embeddings COMPLETE!"))
\ No newline at end of file
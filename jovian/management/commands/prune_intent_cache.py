@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jovian.services.supervisor import prune_intent_cache
+
+
+class Command(BaseCommand):
+    help = 'Prune expired, outdated and over-cap entries from the intent cache'
+
+    def handle(self, *args, **options) -> None:
+        remaining = prune_intent_cache()
+        self.stdout.write(self.style.SUCCESS(f"✅ Intent cache pruned - {remaining} entries left"))
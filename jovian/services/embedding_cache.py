@@ -0,0 +1,51 @@
+import hashlib
+import threading
+from typing import List
+
+from cachetools import LRUCache
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    In-process LRU cache in front of an embeddings model.
+
+    Repeat queries (same model + text) are answered from memory instead of
+    another round trip to the embeddings API.
+    """
+
+    def __init__(self, inner: Embeddings, maxsize: int = 10_000):
+        self.inner = inner
+        self.model = getattr(inner, "model", type(inner).__name__)
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).digest()
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        with self._lock:
+            vector = self._cache.get(key)
+        if vector is not None:
+            return vector
+
+        vector = self.inner.embed_query(text)
+        with self._lock:
+            self._cache[key] = vector
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            vectors = [self._cache.get(key) for key in keys]
+
+        # ✅ Only the misses go to the API, in a single batched call
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            fresh = self.inner.embed_documents([texts[i] for i in misses])
+            with self._lock:
+                for i, vector in zip(misses, fresh):
+                    self._cache[keys[i]] = vector
+                    vectors[i] = vector
+        return vectors
@@ -4,15 +4,63 @@ from langchain_core.messages import SystemMessage
 from langchain.agents.middleware import before_model
 from langchain_core.messages import HumanMessage
 
+import hashlib
+import logging
+import textwrap
+import threading
+from typing import Any
 from dataclasses import dataclass
 from ..helpers.system_prompt import SYSTEM_PROMPT
 
+logger = logging.getLogger(__name__)
+
 @dataclass
 class AgentContext:
     rag_context: str      # Actual knowledge content
     has_rag_data: bool
 
 
+# ✅ Compiled agents keyed by (model, checkpointer) identity - built once per process
+_AGENT_CACHE_SIZE = 4
+_AGENT_CACHE: dict[tuple[int, int], tuple[Any, Any, Any]] = {}
+_AGENT_CACHE_LOCK = threading.Lock()
+
+# ✅ Dedented once at import - only the RAG context is filled in per call
+_RAG_TEMPLATE_HAS = textwrap.dedent("""
+    ## RAG CONTEXT - USE THIS INFORMATION:
+
+    {rag_context}
+
+    ---
+
+    Instructions for using the above context:
+    - Answer the client's question using ONLY the provided RAG context above
+    - Be specific and cite details from the knowledge base
+    - Never speculate beyond what's in the context
+    - If the question isn't covered, say so professionally
+    """)
+
+_RAG_TEMPLATE_EMPTY = textwrap.dedent("""
+    ## NO KNOWLEDGE BASE AVAILABLE
+
+    You do not have specific information for this query in our knowledge base.
+    - Do NOT make up information or guess
+    - Politely inform the client: "We don't have specific information on this in our system"
+    - Suggest: "I'd recommend contacting our team directly for accurate details"
+    - Keep the tone professional and helpful
+    """)
+
+
+def _rag_message_id(rag_context: str) -> str:
+    """Stable message id for a given RAG context"""
+    rag_hash = hashlib.blake2b(rag_context.encode("utf-8"), digest_size=8).hexdigest()
+    return f"rag-context-{rag_hash}"
+
+
+# ✅ Constant message for the no-knowledge case - built (and validated) once
+_EMPTY_RAG_MSG = SystemMessage(content=_RAG_TEMPLATE_EMPTY, id=_rag_message_id(""))
+
+
 def create_rag_context_middleware():
     """
     Middleware that injects RAG context into the system message.
@@ -20,61 +68,40 @@ def create_rag_context_middleware():
     """
     
     @before_model
-    def inject_rag_context(request, runtime: ToolRuntime[AgentContext]) -> str:
+    def inject_rag_context(state, runtime: ToolRuntime[AgentContext]) -> dict | None:
         """Inject RAG context into system message dynamically"""
         
        # ✅ CORRECT: Access context from request.runtime.context
         rag_context = runtime.context.rag_context
         has_rag_data = runtime.context.has_rag_data
         
-        print(f"[MIDDLEWARE] Injecting RAG context ({len(rag_context)} chars, has_data={has_rag_data})")
+        logger.debug("[MIDDLEWARE] Injecting RAG context (%d chars, has_data=%s)", len(rag_context), has_rag_data)
         
-        # Build dynamic context instruction
-        if has_rag_data:
-            rag_instruction = f"""
-            ## RAG CONTEXT - USE THIS INFORMATION:
-
-            {rag_context}
-
-            ---
-
-            Instructions for using the above context:
-            - Answer the client's question using ONLY the provided RAG context above
-            - Be specific and cite details from the knowledge base
-            - Never speculate beyond what's in the context
-            - If the question isn't covered, say so professionally
-            """
-        else:
-            rag_instruction = """
-            ## NO KNOWLEDGE BASE AVAILABLE
-
-            You do not have specific information for this query in our knowledge base.
-            - Do NOT make up information or guess
-            - Politely inform the client: "We don't have specific information on this in our system"
-            - Suggest: "I'd recommend contacting our team directly for accurate details"
-            - Keep the tone professional and helpful
-            """
+        # ✅ Same RAG context as an earlier model call → already in the history, skip.
+        # The id also lets add_messages replace instead of duplicate the message.
+        rag_message_id = _rag_message_id(rag_context) if has_rag_data else _EMPTY_RAG_MSG.id
+        if any(message.id == rag_message_id for message in state["messages"]):
+            return None
         
-        # Modify the system message to include RAG context
-        # original_system_msg = request.system_message
+        if not has_rag_data:
+            return {"messages": [_EMPTY_RAG_MSG]}
         
-        # if original_system_msg:
-        #     # Append RAG context to existing system message
-        #     new_content = str(original_system_msg.content) + "\n" + rag_instruction
-        #     new_system_msg = SystemMessage(content=new_content)
-        # else:
-        #     # Create new system message with RAG context
-        #     new_system_msg = SystemMessage(content=rag_instruction)
+        # Build dynamic context instruction
+        rag_instruction = _RAG_TEMPLATE_HAS.format_map({"rag_context": rag_context})
         
-        # Update request with modified system message
+        # Static SYSTEM_PROMPT stays first; RAG block follows it in the history
         return {
-            "messages": [SystemMessage(content=rag_instruction)],
+            "messages": [SystemMessage(content=rag_instruction, id=rag_message_id)],
         }
         
     
     return inject_rag_context
 
 
+# ✅ Stateless (reads only runtime.context) - one instance shared by every agent
+RAG_MIDDLEWARE = create_rag_context_middleware()
+
+
 def create_message_agent(model, checkpointer):
     """
     Create a message generation agent that grounds responses in RAG context.
@@ -87,19 +114,27 @@ def create_message_agent(model, checkpointer):
         checkpointer: Optional checkpointer for persistence
     
     Returns:
-        Compiled agent with context-aware grounding
+        Compiled agent with context-aware grounding (cached per model/checkpointer)
     """
+    cache_key = (id(model), id(checkpointer))
+    with _AGENT_CACHE_LOCK:
+        cached = _AGENT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached[2]
 
-    # Create middleware that injects RAG context
-    rag_middleware = create_rag_context_middleware()
-    
     # Create agent with context schema
     agent = create_agent(
         model=model,
         system_prompt=SYSTEM_PROMPT,
         context_schema=AgentContext,
-        middleware=[rag_middleware],
+        middleware=[RAG_MIDDLEWARE],
         checkpointer=checkpointer,
     )
     
+    with _AGENT_CACHE_LOCK:
+        if len(_AGENT_CACHE) >= _AGENT_CACHE_SIZE:
+            _AGENT_CACHE.pop(next(iter(_AGENT_CACHE)))  # Evict oldest
+        # Keep model/checkpointer referenced so their ids cannot be reused
+        _AGENT_CACHE[cache_key] = (model, checkpointer, agent)
+    
     return agent
\ No newline at end of file
@@ -3,6 +3,8 @@ from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.types import interrupt, Command, RetryPolicy
 from langchain_chroma import Chroma
+from langchain_chroma.vectorstores import maximal_marginal_relevance
+from langchain_core.documents import Document
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_classic.retrievers import MultiQueryRetriever
 from langchain_openai import OpenAIEmbeddings
@@ -11,20 +13,91 @@ from langchain.agents import create_agent
 # from langchain_community.vectorstores import Chroma  # or your vectorstore
 # from langchain.tools.retriever import create_retriever_tool
 
-from typing import Optional, Annotated, Literal, Any, Dict
+from typing import Optional, Annotated, Literal, Any, Dict, Callable
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 from pathlib import Path
 from ..helpers.system_prompt import SYSTEM_PROMPT
+from .embedding_cache import CachedEmbeddings
+import re
+import json
+import hashlib
+import os
+import time
+import textwrap
+import logging
 import operator
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from dataclasses import dataclass
 
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 CHROMA_DB_PATH = BASE_DIR / "jovian/chroma_db"
 COLLECTION_NAME = 'project_portfolio'
-
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+INTENT_CACHE_COLLECTION = 'intent_cache'
+INTENT_CACHE_MAX_DISTANCE = 0.05  # cosine distance, i.e. similarity > 0.95
+INTENT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+INTENT_CACHE_MAX_ENTRIES = 5000
+INTENT_CACHE_PRUNE_EVERY = 200  # Stores between background prune passes
+USE_MULTI_QUERY_RETRIEVER = False  # Opt-in: LLM-written alternate queries
+HISTORY_WINDOW = 8          # Most recent messages always passed verbatim to the message agent
+SUMMARY_REFRESH_EVERY = 4   # Re-summarize once this many messages leave the window
+
+CLASSIFICATION_SYSTEM_MESSAGE = SystemMessage(content=textwrap.dedent("""
+    You are an intent classifier for a digital agency AI assistant.
+
+    Classify the user's message into exactly ONE intent:
+
+    - knowledge_search: asking about projects, technologies, CMS, services, stacks, agency work
+    - how_it_works: conceptual or explanatory questions
+    - comparison: comparing technologies, frameworks, CMS, tools
+    - task_request: asking the AI to generate, build, analyze, or perform a task
+    - general_chat: greetings, thanks, casual or unclear messages
+
+    Return ONLY the intent name.
+    No explanation.
+    No extra text.
+""").strip())
+
+SMALL_TALK_REPLIES = [
+    (
+        re.compile(r"^(hi+|hello|hey|hey there|greetings|good (morning|afternoon|evening))[\s!.,]*$"),
+        "Hello! Thanks for reaching out to Brihaspati Infotech. What project or requirement can I help you with today?",
+    ),
+    (
+        re.compile(r"^(thanks|thank you|thank you so much|thx|ty)[\s!.,]*$"),
+        "You're welcome! Let me know if there's anything else about your project I can help with.",
+    ),
+    (
+        re.compile(r"^(bye|goodbye|see you|talk later)[\s!.,]*$"),
+        "Thanks for chatting with us. Feel free to reach out anytime - have a great day!",
+    ),
+]
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a client conversation with an agency assistant. "
+    "Keep project requirements, technologies, constraints, and open questions. "
+    "Return only the updated summary in under 150 words."
+)
+
+# ✅ One embeddings object for the portfolio collection - must match the model
+# the collection was built with (generate_taxonomy_embeddings)
+embeddings = CachedEmbeddings(OpenAIEmbeddings(model="text-embedding-3-large"))
+
+_VECTORSTORE: Optional[Chroma] = None
+_VECTORSTORE_LOCK = threading.Lock()
+
+_INTENT_CACHE_STORES = 0
+_INTENT_CACHE_STORES_LOCK = threading.Lock()
+
+# ✅ Compiled supervisor graphs keyed by input identity - built once per process
+_SUPERVISOR_CACHE_SIZE = 4
+_SUPERVISOR_CACHE: dict[tuple[int, int, int], tuple[Any, Any, Any, Any]] = {}
+_SUPERVISOR_CACHE_LOCK = threading.Lock()
 
 class RouteQuery(BaseModel):
     """Route user query for agency knowledge & execution."""
@@ -42,6 +115,11 @@ class RouteQuery(BaseModel):
     topic: str
     summary: str
 
+# ✅ Cached intents are only valid for the prompt + schema that produced them
+INTENT_CACHE_VERSION = hashlib.sha256(
+    (CLASSIFICATION_SYSTEM_MESSAGE.content + json.dumps(RouteQuery.model_json_schema(), sort_keys=True)).encode("utf-8")
+).hexdigest()[:16]
+
 @dataclass
 class AgentContext:
     rag_context: str      # Actual knowledge content
@@ -50,17 +128,266 @@ class AgentContext:
 
 def get_vectorstore() -> Chroma:
     """
-    Re-open the existing Chroma collection using the same settings
-    used when creating the embeddings.
+    Shared handle on the existing Chroma collection, opened once per process
+    with the same settings used when creating the embeddings.
+    """
+    global _VECTORSTORE
+    if _VECTORSTORE is None:
+        with _VECTORSTORE_LOCK:
+            if _VECTORSTORE is None:
+                _VECTORSTORE = Chroma(
+                    collection_name=COLLECTION_NAME,
+                    embedding_function=embeddings,
+                    persist_directory=str(CHROMA_DB_PATH),
+                )
+    return _VECTORSTORE
+
+
+def warm_vectorstore() -> None:
+    """
+    Pull the Chroma files into the OS page cache and run one ANN query so the
+    first user request doesn't pay the cold-disk cost.
+    """
+    if hasattr(os, "posix_fadvise"):
+        for path in CHROMA_DB_PATH.rglob("*"):
+            if path.is_file():
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                    try:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+
+    # Query with a stored vector - walks the HNSW index without an embeddings API call
+    collection = get_vectorstore()._collection
+    sample = collection.peek(limit=1)["embeddings"]
+    if sample is not None and len(sample):
+        collection.query(query_embeddings=[sample[0]], n_results=1, include=[])
+
+
+@functools.lru_cache(maxsize=1)
+def get_multi_query_retriever() -> MultiQueryRetriever:
+    """Alternate-query retriever over the shared vectorstore, built once per process"""
+    base_retriever = get_vectorstore().as_retriever(
+        search_type="mmr",
+        search_kwargs={
+            "k": 6,          # How many unique docs to return per query
+            "fetch_k": 20,   # Pool of docs to select from
+        }
+    )
+    retrieval_llm = ChatOpenAI(temperature=0, model="gpt-4o-mini")
+    return MultiQueryRetriever.from_llm(retriever=base_retriever, llm=retrieval_llm)
+
+
+@functools.lru_cache(maxsize=1)
+def _intent_cache_collection():
+    """Small cosine collection of (user message -> RouteQuery) classifications"""
+    return get_vectorstore()._client.get_or_create_collection(
+        INTENT_CACHE_COLLECTION,
+        metadata={"hnsw:space": "cosine"},
+    )
+
+
+def _normalize_message(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def lookup_cached_intent(user_message: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a cached classification if a near-identical message was seen before.
+
+    Only intent/urgency are cached; topic/summary always describe the live
+    message, since rag_executor retrieves with them.
+    """
+    normalized = _normalize_message(user_message)
+    if not normalized:
+        return None
+    try:
+        hits = _intent_cache_collection().query(
+            query_embeddings=[embeddings.embed_query(normalized)],
+            n_results=1,
+            where={"$and": [
+                {"version": INTENT_CACHE_VERSION},
+                {"created_at": {"$gte": time.time() - INTENT_CACHE_TTL_SECONDS}},
+            ]},
+            include=["metadatas", "distances"],
+        )
+        if hits["distances"][0] and hits["distances"][0][0] < INTENT_CACHE_MAX_DISTANCE:
+            metadata = hits["metadatas"][0][0]
+            return {
+                "intent": metadata["intent"],
+                "urgency": metadata["urgency"],
+                "topic": user_message,
+                "summary": user_message,
+            }
+    except Exception as e:
+        logger.warning("[INTENT CACHE] Lookup failed: %s", e)
+    return None
+
+
+def store_cached_intent(user_message: str, classification: Dict[str, Any]) -> None:
+    """Remember a fresh intent/urgency for later near-duplicate messages"""
+    normalized = _normalize_message(user_message)
+    if not normalized:
+        return
+    try:
+        collection = _intent_cache_collection()
+        # No document text is stored - only the embedding and the labels
+        collection.upsert(
+            ids=[hashlib.sha256(normalized.encode("utf-8")).hexdigest()],
+            embeddings=[embeddings.embed_query(normalized)],
+            metadatas=[{
+                "intent": classification["intent"],
+                "urgency": classification["urgency"],
+                "version": INTENT_CACHE_VERSION,
+                "created_at": time.time(),
+            }],
+        )
+    except Exception as e:
+        logger.warning("[INTENT CACHE] Store failed: %s", e)
+        return
+
+    # ✅ Pruning is off the request path - a background pass every N stores
+    # (also available as `manage.py prune_intent_cache`)
+    global _INTENT_CACHE_STORES
+    with _INTENT_CACHE_STORES_LOCK:
+        _INTENT_CACHE_STORES += 1
+        due = _INTENT_CACHE_STORES % INTENT_CACHE_PRUNE_EVERY == 0
+    if due:
+        threading.Thread(target=_prune_intent_cache_quietly, name="intent-cache-prune", daemon=True).start()
+
+
+def _prune_intent_cache_quietly() -> None:
+    try:
+        prune_intent_cache()
+    except Exception:
+        logger.warning("[INTENT CACHE] Prune failed", exc_info=True)
+
+
+def prune_intent_cache() -> int:
+    """Drop expired / other-version entries, then the oldest beyond the cap; returns entries left"""
+    collection = _intent_cache_collection()
+    collection.delete(where={"$or": [
+        {"created_at": {"$lt": time.time() - INTENT_CACHE_TTL_SECONDS}},
+        {"version": {"$ne": INTENT_CACHE_VERSION}},
+    ]})
+
+    overflow = collection.count() - INTENT_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        entries = collection.get(include=["metadatas"])
+        oldest = sorted(
+            zip(entries["ids"], entries["metadatas"]),
+            key=lambda entry: entry[1].get("created_at", 0),
+        )[:overflow]
+        collection.delete(ids=[entry_id for entry_id, _ in oldest])
+
+    return collection.count()
+
+
+def windowed_history(
+    history: list,
+    summary: str,
+    summarized_count: int,
+    summarize: Callable[[str, list], str],
+) -> tuple[list, Dict[str, Any]]:
+    """
+    Messages for the reply agent: running summary + every message it doesn't cover.
+
+    The summary covers history[:summarized_count]; everything after that is sent
+    verbatim, so no message is ever dropped. Once SUMMARY_REFRESH_EVERY messages
+    have left the last HISTORY_WINDOW, they are folded into the summary - the
+    verbatim tail is therefore at most HISTORY_WINDOW + SUMMARY_REFRESH_EVERY - 1.
+    """
+    if len(history) <= HISTORY_WINDOW:
+        return list(history), {}
+
+    older_count = len(history) - HISTORY_WINDOW
+    summary_update: Dict[str, Any] = {}
+
+    if not summary or older_count - summarized_count >= SUMMARY_REFRESH_EVERY:
+        try:
+            summary = summarize(summary, history[summarized_count:older_count])
+            summarized_count = older_count
+            summary_update = {"history_summary": summary, "summarized_count": summarized_count}
+        except Exception:
+            # A failed refresh must never cost the reply - keep the previous
+            # summary and send the rest verbatim; retried on the next turn
+            logger.warning("[MESSAGE GENERATOR] History summary refresh failed", exc_info=True)
+
+    window = [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")] if summary else []
+    return window + history[summarized_count:], summary_update
+
+
+def canned_small_talk_reply(state: Dict[str, Any]) -> Optional[str]:
+    """Canned reply for a bare greeting / thanks / goodbye, else None"""
+    if state.get("intent") != "general_chat":
+        return None
+    text = state.get("user_message", "").lower().strip()
+    for pattern, reply in SMALL_TALK_REPLIES:
+        if pattern.match(text):
+            return reply
+    return None
+
+
+def _dedupe_documents(per_query_docs) -> list:
+    """Unique union across queries, first occurrence wins"""
+    results = []
+    seen = set()
+    for docs in per_query_docs:
+        for doc in docs:
+            key = doc.id or doc.page_content
+            if key not in seen:
+                seen.add(key)
+                results.append(doc)
+    return results
+
+
+def multi_query_retrieve(query: str) -> list:
+    """LLM-generated alternate queries (MultiQueryRetriever) - fallback path"""
+    advanced_retriever = get_multi_query_retriever()
+    base_retriever = advanced_retriever.retriever
+
+    # ✅ Original query is retrieved while the LLM writes the alternates,
+    # then all alternates are retrieved in parallel (batch = thread pool)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        original_docs = executor.submit(base_retriever.invoke, query)
+        alt_queries = advanced_retriever.llm_chain.invoke({"question": query})
+        per_query_docs = [original_docs.result(), *base_retriever.batch(alt_queries)]
+
+    return _dedupe_documents(per_query_docs)
+
+
+def structured_query_retrieve(queries: list[str], k: int = 6, fetch_k: int = 20) -> list:
+    """
+    One Chroma query for all structured queries, then a local MMR rerank of
+    the union against the mean query vector - no extra LLM round trip.
     """
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+    query_vectors = embeddings.embed_documents(queries)
+    hits = get_vectorstore()._collection.query(
+        query_embeddings=query_vectors,
+        n_results=fetch_k,
+        include=["documents", "metadatas", "embeddings"],
+    )
 
-    vectorstore = Chroma(
-        collection_name=COLLECTION_NAME,
-        embedding_function=embeddings,
-        persist_directory=str(CHROMA_DB_PATH),
+    candidates = {}
+    for ids, contents, metadatas, vectors in zip(
+        hits["ids"], hits["documents"], hits["metadatas"], hits["embeddings"]
+    ):
+        for doc_id, content, metadata, vector in zip(ids, contents, metadatas, vectors):
+            if doc_id not in candidates:
+                candidates[doc_id] = (Document(id=doc_id, page_content=content, metadata=metadata or {}), vector)
+    if not candidates:
+        return []
+
+    docs, vectors = zip(*candidates.values())
+    selected = maximal_marginal_relevance(
+        np.mean(np.asarray(query_vectors, dtype=np.float32), axis=0),
+        list(vectors),
+        k=min(k, len(docs)),
     )
-    return vectorstore
+    return [docs[i] for i in selected]
 
 
 def create_supervisor_agent(llm, message_agent, checkpointer):
@@ -73,8 +400,18 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
         checkpointer: Checkpoint saver for graph persistence
     
     Returns:
-        Compiled supervisor graph
+        Compiled supervisor graph (cached per llm/message_agent/checkpointer)
     """
+    cache_key = (id(llm), id(message_agent), id(checkpointer))
+    with _SUPERVISOR_CACHE_LOCK:
+        cached = _SUPERVISOR_CACHE.get(cache_key)
+    if cached is not None:
+        return cached[3]
+
+    # ✅ Structured-output chain built once per graph, not on every turn
+    structured_llm = llm.with_structured_output(RouteQuery)
+    # ✅ Plain (no RAG context) reply agent, compiled once with the graph
+    no_rag_agent = create_agent(model=llm, system_prompt=SYSTEM_PROMPT)
 
     # ✅ FIXED State - Clean conversation tracking
     class SupervisorState(TypedDict):
@@ -88,13 +425,16 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
         response_generated: bool                # ✅ CRITICAL: Prevent duplicates
         final_response: str
         goto: str
+        routing_decision: str                   # Set by router_node, read by the conditional edge
+        history_summary: str                    # Running summary of messages outside the window
+        summarized_count: int                   # How many leading messages the summary covers
 
     def read_message(state: SupervisorState) -> SupervisorState:
         """✅ FIXED: Extract ONLY latest user message"""
         # Get ONLY the last user message
         input_messages = state.get("messages", [])
 
-        print("INPUT MESSAGES ####", input_messages)
+        logger.debug("[READ MESSAGE] %d input messages", len(input_messages))
         if input_messages:
             last_msg = input_messages[-1]
             user_message = last_msg.content if hasattr(last_msg, 'content') else str(last_msg)
@@ -104,45 +444,27 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
         return {
             "user_message": user_message,
             "current_conversation": [HumanMessage(content=user_message)],  # Clean slate
-            "messages": input_messages,
+            "rag_data": [],  # Don't carry the previous turn's documents over
             "response_generated": False  # Reset for new turn
         }
 
     def intent_classifier(state: SupervisorState) -> Command[Literal["rag_executor", "general_message"]]:
         """Classify user intent using structured output"""
 
-        print("!!! ENTER INTENT CLASSIFIER NODD !!!")
-
+        logger.debug("[INTENT] Classifying message")
 
         user_message = state.get("user_message", "")
 
-        classification_prompt = """
-        You are an intent classifier for a digital agency AI assistant.
+        # ✅ Near-duplicate messages reuse an earlier classification - no LLM call
+        classification_dict = lookup_cached_intent(user_message)
 
-        Classify the user's message into exactly ONE intent:
+        if classification_dict is None:
+            classification = structured_llm.invoke([CLASSIFICATION_SYSTEM_MESSAGE, HumanMessage(content=user_message)])
 
-        - knowledge_search: asking about projects, technologies, CMS, services, stacks, agency work
-        - how_it_works: conceptual or explanatory questions
-        - comparison: comparing technologies, frameworks, CMS, tools
-        - task_request: asking the AI to generate, build, analyze, or perform a task
-        - general_chat: greetings, thanks, casual or unclear messages
+            # ✅ CRITICAL FIX: Convert Pydantic object to dict
+            classification_dict = classification.model_dump()  # Pydantic v2
+            store_cached_intent(user_message, classification_dict)
 
-        Return ONLY the intent name.
-        No explanation.
-        No extra text.
-
-        """
-
-        # Use with_structured_output for structured output
-        structured_llm = llm.with_structured_output(RouteQuery)
-        
-        classification = structured_llm.invoke([SystemMessage(content=classification_prompt), HumanMessage(content=user_message)])
-
-        # ✅ CRITICAL FIX: Convert Pydantic object to dict
-        classification_dict = classification.model_dump()  # Pydantic v2
-        # Fallback for Pydantic v1:
-        # classification_dict = classification.dict() 
-        
         intent = classification_dict.get("intent", "general_chat")
 
         if intent in ["knowledge_search", "comparison", "how_it_works", "task_request"]:
@@ -150,7 +472,7 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
         else:
             goto = "general_message"
 
-        print("### INTENT FOUND #####", intent)
+        logger.debug("[INTENT] %s -> %s", intent, goto)
 
         return {
             "intent": intent,
@@ -164,38 +486,36 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
         classification = state.get('classification', {})
         query = f"{classification.get('intent', '')} {classification.get('topic', '')}"
 
-        print("### ENTER RAG EXECUTOR NODD ###", query)
+        logger.debug("[RAG] Query: %s", query)
 
-        try:
-            vectorstore = get_vectorstore()
-            
-            base_retriever = vectorstore.as_retriever(
-                search_type="mmr", 
-                search_kwargs={
-                    "k": 6,          # How many unique docs to return per query
-                    "fetch_k": 20,   # Pool of docs to select from
-                }
-            )
-
-            retrieval_llm = ChatOpenAI(temperature=0, model="gpt-4o-mini")
+        # ✅ The classifier already produced topic + summary - use them as the
+        # alternate queries instead of asking another LLM to write some
+        structured_queries = list(dict.fromkeys(
+            q for q in (classification.get('topic'), classification.get('summary'), query.strip()) if q
+        ))
 
-            # MultiQueryRetriever
-            advanced_retriever = MultiQueryRetriever.from_llm(
-                retriever=base_retriever,
-                llm=retrieval_llm
-            )
-
-            # Invoke returns List[Document]
-            results = advanced_retriever.invoke(query)
+        try:
+            if USE_MULTI_QUERY_RETRIEVER or not structured_queries:
+                results = multi_query_retrieve(query)
+            else:
+                results = structured_query_retrieve(structured_queries)
 
-            print(f"[RAG] Retrieved {len(results)} documents")
+            logger.debug("[RAG] Retrieved %d documents", len(results))
 
             return {"rag_data": results}           
         
         except Exception as e:
-            print(f"[RAG Error] {str(e)}")
+            logger.warning("[RAG] Retrieval failed: %s", e)
             return {"rag_data": []}
 
+    def summarize_history(summary: str, new_messages: list) -> str:
+        """Fold new_messages into the running summary with one LLM call"""
+        transcript = "\n".join(f"{m.type}: {m.content}" for m in new_messages)
+        return llm.invoke([
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"),
+        ]).content
+
     def general_message(state: SupervisorState) -> SupervisorState:
         """
         Generate response using message agent with RAG context grounding.
@@ -207,13 +527,29 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
         4. Invoke agent with context
         5. Extract and return response
         """
-        messages = state.get("messages", [])
-        search_results = state.get("rag_data", [])
+        # ✅ Bare greetings / thanks get a canned reply - no agent or LLM call
+        canned_reply = canned_small_talk_reply(state)
+        if canned_reply is not None:
+            logger.debug("[MESSAGE GENERATOR] Small talk - canned reply")
+            return {
+                "messages": [AIMessage(content=canned_reply)],
+                "current_conversation": [AIMessage(content=canned_reply)],
+                "final_response": canned_reply,
+                "response_generated": True,
+                "task_description": "Response complete",
+            }
 
+        search_results = state.get("rag_data", [])
 
-        print(f"[MESSAGE GENERATOR] Processing {len(messages)} messages with {len(search_results)} RAG docs")
-        
         try:
+            messages, summary_update = windowed_history(
+                state.get("messages", []),
+                state.get("history_summary", ""),
+                state.get("summarized_count", 0),
+                summarize_history,
+            )
+            logger.debug("[MESSAGE GENERATOR] Processing %d messages with %d RAG docs", len(messages), len(search_results))
+
             # Build RAG context from documents
             rag_context = ""
             has_rag_data = len(search_results) > 0
@@ -227,8 +563,8 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
                     context_parts.append(f"[{category}] {content}")
                 
                 rag_context = "\n\n".join(context_parts)
-                print(f"[MESSAGE GENERATOR] RAG Context (length: {len(rag_context)}):")
-                print(rag_context[:200] + "...\n")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[MESSAGE GENERATOR] RAG Context (length: %d): %s...", len(rag_context), rag_context[:200])
                 result = message_agent.invoke(
                     {"messages": messages},
                     context=AgentContext(
@@ -237,15 +573,9 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
                     )
                 )
             else:
-                print("[MESSAGE GENERATOR] ⚠️ NO RAG DATA - Agent will not hallucinate")
+                logger.debug("[MESSAGE GENERATOR] ⚠️ NO RAG DATA - Agent will not hallucinate")
                 rag_context = ""
-                model = ChatOpenAI(model="gpt-4.1", temperature=0.1)
-                agent = create_agent(
-                    model=model,
-                    system_prompt=SYSTEM_PROMPT,
-                )
-                # Invoke agent with context - THIS IS WHERE GROUNDING HAPPENS
-                result = agent.invoke({"messages": messages})
+                result = no_rag_agent.invoke({"messages": messages})
             
             # Extract the response
             if hasattr(result, "messages") and result.messages:
@@ -261,21 +591,20 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
             else:
                 agent_response = str(result)
             
-            print(f"[MESSAGE GENERATOR] Generated response: {agent_response}")
+            logger.debug("[MESSAGE GENERATOR] Generated response (%d chars)", len(agent_response))
             
             return {
-                **state,  # Preserve everything
-                "messages": state["messages"] + [AIMessage(content=agent_response)],  # Append to history
+                # ✅ Delta only - the operator.add reducer appends it to history
+                "messages": [AIMessage(content=agent_response)],
                 "current_conversation": [AIMessage(content=agent_response)],  # Current turn
                 "final_response": agent_response,
                 "response_generated": True,  # ✅ PREVENTS DUPLICATES!
-                "task_description": "Response complete"
+                "task_description": "Response complete",
+                **summary_update,
             }
             
         except Exception as e:
-            print(f"[MESSAGE GENERATOR ERROR] {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[MESSAGE GENERATOR] Failed to generate response")
             return {
                 "messages": [AIMessage(content=f"Error processing request: {str(e)}")]
             }
@@ -283,7 +612,7 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
     def router_node(state: SupervisorState) -> SupervisorState:
         """✅ FIXED: Router returns dict, not str"""
         goto = state.get("goto", "general_message")
-        print(f"[ROUTER] Processing state → {goto}")
+        logger.debug("[ROUTER] Processing state → %s", goto)
         
         # ✅ LangGraph nodes ALWAYS return dict
         return {
@@ -323,4 +652,11 @@ def create_supervisor_agent(llm, message_agent, checkpointer):
 
     # Compile with checkpointer
     supervisor_graph = workflow.compile(checkpointer=checkpointer)
-    return supervisor_graph
\ No newline at end of file
+
+    with _SUPERVISOR_CACHE_LOCK:
+        if len(_SUPERVISOR_CACHE) >= _SUPERVISOR_CACHE_SIZE:
+            _SUPERVISOR_CACHE.pop(next(iter(_SUPERVISOR_CACHE)))  # Evict oldest
+        # Keep the inputs referenced so their ids cannot be reused
+        _SUPERVISOR_CACHE[cache_key] = (llm, message_agent, checkpointer, supervisor_graph)
+
+    return supervisor_graph
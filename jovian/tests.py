@@ -1,3 +1,194 @@
-from django.test import TestCase
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from rest_framework.test import APIRequestFactory
+
+from .services.supervisor import HISTORY_WINDOW, SUMMARY_REFRESH_EVERY, windowed_history
+from .views import portfolio_view
+from .views.portfolio_view import (
+    CONTENT_PREVIEW_CHARS,
+    VectorStoreAPIView,
+    matches_search,
+    serialize_vector,
+)
+
+
+class FakeVectorStore:
+    """In-memory stand-in for the Chroma vectorstore used by the listing view"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.get_calls = []
+        self._collection = SimpleNamespace(
+            count=lambda: len(self.rows),
+            peek=lambda limit: {"embeddings": [[0.0] * 4]},
+        )
+
+    def get(self, where=None, limit=None, offset=None, include=None):
+        self.get_calls.append({"where": where, "limit": limit, "offset": offset})
+        rows = self.rows
+        if where:
+            rows = [row for row in rows if row[2].get("category") == where["category"]]
+        start = offset or 0
+        rows = rows[start:start + limit] if limit is not None else rows[start:]
+        return {
+            "ids": [row[0] for row in rows],
+            "documents": [row[1] for row in rows],
+            "metadatas": [row[2] for row in rows],
+        }
+
+
+class SearchAndSerializeTests(SimpleTestCase):
+    def test_matches_search_checks_preview_keywords_and_project_ref(self):
+        row = ("id-0", "Built a React dashboard", {"keywords": "saas, stripe", "project_ref": "Acme CRM"})
+        self.assertTrue(matches_search(row, "react"))
+        self.assertTrue(matches_search(row, "stripe"))
+        self.assertTrue(matches_search(row, "acme"))
+        self.assertFalse(matches_search(row, "django"))
+
+    def test_matches_search_ignores_content_beyond_preview(self):
+        content = "x" * CONTENT_PREVIEW_CHARS + " needle"
+        self.assertFalse(matches_search(("id-0", content, {}), "needle"))
+
+    def test_matches_search_tolerates_missing_metadata(self):
+        self.assertTrue(matches_search(("id-0", "Laravel API", None), "laravel"))
+
+    def test_serialize_vector_truncates_and_fills_defaults(self):
+        content = "a" * (CONTENT_PREVIEW_CHARS + 10)
+        row = serialize_vector(7, "id-7", content, {"category": "Technical_Capability"})
+
+        self.assertEqual(row["content"], "a" * CONTENT_PREVIEW_CHARS + "...")
+        self.assertEqual(row["full_content"], content)
+        self.assertEqual(row["index"], 7)
+        self.assertEqual(row["metadata"]["category"], "Technical_Capability")
+        self.assertEqual(row["metadata"]["chunk_id"], 7)
+        self.assertEqual(row["metadata"]["taxonomy_score"], 1.0)
+        self.assertEqual(row["metadata"]["keywords"], "")
+
+    def test_serialize_vector_keeps_stored_chunk_id_and_drops_unknown_fields(self):
+        row = serialize_vector(0, "id-0", "short", {"chunk_id": 42, "internal": "x"})
+        self.assertEqual(row["content"], "short")
+        self.assertEqual(row["metadata"]["chunk_id"], 42)
+        self.assertNotIn("internal", row["metadata"])
+
+
+class VectorStorePagingTests(SimpleTestCase):
+    def setUp(self):
+        portfolio_view._CATEGORIES_CACHE.clear()
+        portfolio_view._COUNT_CACHE.clear()
+        portfolio_view._DIMENSIONS = None
+
+        # Even rows mention React, odd rows mention Vue
+        self.store = FakeVectorStore([
+            (f"id-{i}", f"{'React' if i % 2 == 0 else 'Vue'} project {i}", {"category": "Technical_Capability"})
+            for i in range(6)
+        ])
+        patcher = mock.patch.object(portfolio_view, "get_vectorstore", return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def list_vectors(self, **params):
+        request = APIRequestFactory().get("/api/vectors/", params)
+        return VectorStoreAPIView.as_view()(request)
+
+    def test_without_limit_returns_everything(self):
+        response = self.list_vectors()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data["data"]], [f"id-{i}" for i in range(6)])
+        self.assertEqual(response.data["total_vectors"], 6)
+
+    def test_paging_without_search_is_pushed_to_storage(self):
+        response = self.list_vectors(limit=2, offset=1)
+
+        self.assertEqual([row["id"] for row in response.data["data"]], ["id-1", "id-2"])
+        self.assertEqual([row["index"] for row in response.data["data"]], [1, 2])
+        self.assertEqual(self.store.get_calls[0]["limit"], 2)
+        self.assertEqual(self.store.get_calls[0]["offset"], 1)
+
+    def test_paging_with_search_slices_the_matches(self):
+        response = self.list_vectors(search="react", limit=1, offset=1)
+
+        # Matches are id-0, id-2, id-4 -> page of one starting at the second match
+        self.assertEqual([row["id"] for row in response.data["data"]], ["id-2"])
+        self.assertEqual(response.data["data"][0]["index"], 2)
+        self.assertIsNone(self.store.get_calls[0]["limit"])
+        self.assertIsNone(self.store.get_calls[0]["offset"])
+
+    def test_search_with_offset_past_matches_is_empty(self):
+        response = self.list_vectors(search="react", offset=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"], [])
+
+    def test_invalid_paging_params_return_400(self):
+        for params in ({"limit": "abc"}, {"offset": "1.5"}, {"limit": "-1"}, {"offset": "-3"}):
+            with self.subTest(params=params):
+                response = self.list_vectors(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.data["success"])
+                self.assertEqual(self.store.get_calls, [])
+
+
+class WindowedHistoryTests(SimpleTestCase):
+    @staticmethod
+    def conversation(length):
+        return [
+            (HumanMessage if i % 2 == 0 else AIMessage)(content=f"m{i}")
+            for i in range(length)
+        ]
+
+    @staticmethod
+    def fake_summarize(summary, new_messages):
+        # Summary is the list of covered message contents
+        return ",".join(filter(None, [summary, *(m.content for m in new_messages)]))
+
+    def test_short_history_is_sent_as_is(self):
+        history = self.conversation(HISTORY_WINDOW)
+        messages, update = windowed_history(history, "", 0, self.fake_summarize)
+        self.assertEqual(messages, history)
+        self.assertEqual(update, {})
+
+    def test_every_message_is_covered_at_every_turn(self):
+        summary, summarized_count = "", 0
+        for length in range(1, 60):
+            history = self.conversation(length)
+            messages, update = windowed_history(history, summary, summarized_count, self.fake_summarize)
+            summary = update.get("history_summary", summary)
+            summarized_count = update.get("summarized_count", summarized_count)
+
+            verbatim = [m.content for m in messages if not isinstance(m, SystemMessage)]
+            summarized = summary.split(",") if summary else []
+            with self.subTest(length=length):
+                # Summary + verbatim tail is exactly the history, in order, no gaps
+                self.assertEqual(summarized + verbatim, [m.content for m in history])
+                self.assertGreaterEqual(len(verbatim), min(length, HISTORY_WINDOW))
+                self.assertLessEqual(len(verbatim), HISTORY_WINDOW + SUMMARY_REFRESH_EVERY - 1)
+
+    def test_refresh_only_every_n_messages(self):
+        calls = []
+
+        def summarize(summary, new_messages):
+            calls.append(len(new_messages))
+            return self.fake_summarize(summary, new_messages)
+
+        summary, summarized_count = "", 0
+        for length in range(1, 30):
+            _, update = windowed_history(self.conversation(length), summary, summarized_count, summarize)
+            summary = update.get("history_summary", summary)
+            summarized_count = update.get("summarized_count", summarized_count)
+
+        self.assertEqual(calls[0], 1)
+        self.assertTrue(all(n == SUMMARY_REFRESH_EVERY for n in calls[1:]))
+
+    def test_failed_refresh_keeps_previous_summary_and_sends_the_rest(self):
+        def failing_summarize(summary, new_messages):
+            raise RuntimeError("rate limited")
+
+        history = self.conversation(HISTORY_WINDOW + SUMMARY_REFRESH_EVERY + 2)
+        messages, update = windowed_history(history, "m0,m1", 2, failing_summarize)
+
+        self.assertEqual(update, {})
+        self.assertIsInstance(messages[0], SystemMessage)
+        self.assertIn("m0,m1", messages[0].content)
+        self.assertEqual([m.content for m in messages[1:]], [m.content for m in history[2:]])
@@ -23,8 +23,13 @@ if os.getenv("ENV_TYPE") == 'localhost':
 else:
     DB_URI = os.getenv("POSTGRES_URL_PROD")
 
-# Initialize connection pool
-connection_pool = ConnectionPool(DB_URI, min_size=1, max_size=5)
+# Initialize connection pool (autocommit so it can back a shared PostgresSaver)
+connection_pool = ConnectionPool(
+    DB_URI,
+    min_size=1,
+    max_size=5,
+    kwargs={"autocommit": True, "prepare_threshold": 0},
+)
 
 def init_checkpointer():
     with connection_pool.connection() as conn:
@@ -47,6 +52,10 @@ except Exception as e:
 # LOAD ENV VARIABLE
 load_dotenv()
 
+# ✅ Process-wide model + checkpointer so compiled agents can be reused across requests
+checkpointer = PostgresSaver(connection_pool)
+model = ChatOpenAI(model="gpt-4.1", temperature=0.1)
+
 class CustomAgentState(AgentState):
     """Custom state with messages + custom fields"""
     categories: list = []
@@ -78,41 +87,34 @@ def chat_asistance(request: HttpRequest):
 
     config = {"configurable": {"thread_id": session_id}}
 
-    # ---- Create model ----
-    model = ChatOpenAI(model="gpt-4.1", temperature=0.1)
+    # Create specialist agents (cached - compiled once per process)
+    message_agent = create_message_agent(model, checkpointer)
+    # email_agent = create_email_agent(model, checkpointer)
+
+    # Create supervisor
+    supervisor_agent = create_supervisor_agent(model, message_agent, checkpointer)
 
+    agent_input = {
+        "messages": [HumanMessage(content=user_message)],
+        "user_message": user_message
+    }
     
-    # Create agent with checkpointer
-    with connection_pool.connection() as conn:
-        checkpointer = PostgresSaver(conn)
-        # Create specialist agents
-        message_agent = create_message_agent(model, checkpointer)
-        # email_agent = create_email_agent(model, checkpointer)
-
-        # Create supervisor
-        supervisor_agent = create_supervisor_agent(model, message_agent, checkpointer)
-
-        agent_input = {
-            "messages": [HumanMessage(content=user_message)],
-            "user_message": user_message
-        }
-        
-        try:
-            response = StreamingHttpResponse(
-                stream_generator(
-                    agent=supervisor_agent,
-                    agent_input=agent_input,
-                    config=config,
-                ),
-                content_type="text/event-stream",
-                charset="utf-8",
-            )
-            response['Cache-Control'] = 'no-cache'
-            return response
-        except Exception as e:
-            print(f"Error in agent: {e}")
-            error_detail = traceback.format_exc()
-            return JsonResponse(
-                {"error": str(e), "detail": error_detail}, 
-                status=400
-            )
\ No newline at end of file
+    try:
+        response = StreamingHttpResponse(
+            stream_generator(
+                agent=supervisor_agent,
+                agent_input=agent_input,
+                config=config,
+            ),
+            content_type="text/event-stream",
+            charset="utf-8",
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        print(f"Error in agent: {e}")
+        error_detail = traceback.format_exc()
+        return JsonResponse(
+            {"error": str(e), "detail": error_detail}, 
+            status=400
+        )
\ No newline at end of file
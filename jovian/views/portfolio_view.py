@@ -3,93 +3,173 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.http import JsonResponse
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from pathlib import Path
 import json
-from typing import Dict, Any, List
+import threading
+from itertools import islice
+from cachetools import TTLCache
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
+from ..services.supervisor import get_vectorstore
 
 
 load_dotenv()
 
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-CHROMA_DB_PATH = BASE_DIR / "jovian/chroma_db"
 COLLECTION_NAME = "project_portfolio"
 
-embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+# ✅ Category dropdown values change only when the collection is rebuilt
+_CATEGORIES_CACHE: TTLCache = TTLCache(maxsize=1, ttl=300)
+_CATEGORIES_LOCK = threading.Lock()
+
+_COUNT_CACHE: TTLCache = TTLCache(maxsize=1, ttl=60)
+_COUNT_LOCK = threading.Lock()
+
+CONTENT_PREVIEW_CHARS = 500
+
+# Frontend metadata schema with defaults for fields missing on a document
+METADATA_DEFAULTS: Dict[str, Any] = {
+    "category": "unknown",
+    "sub_type": "",
+    "keywords": "",
+    "project_ref": "",
+    "evidence_type": "",
+    "taxonomy_score": 1.0,
+    "chunk_id": None,  # Falls back to the row index
+    "source": "",
+    "created_at": "",
+}
+METADATA_FIELDS = tuple(METADATA_DEFAULTS)
+
+DEFAULT_DIMENSIONS = 3072  # text-embedding-3-large
+_DIMENSIONS: int | None = None
+
+
+def get_categories(vectorstore) -> List[str]:
+    """Sorted unique categories in the collection (metadata-only scan, cached)"""
+    with _CATEGORIES_LOCK:
+        categories = _CATEGORIES_CACHE.get("categories")
+    if categories is None:
+        metadatas = vectorstore.get(include=["metadatas"])['metadatas']
+        categories = sorted(set((m or {}).get("category", "unknown") for m in metadatas))
+        with _CATEGORIES_LOCK:
+            _CATEGORIES_CACHE["categories"] = categories
+    return categories
+
+
+def get_total_count(vectorstore) -> int:
+    """Collection size via Chroma's count() (no id fetch), cached briefly"""
+    with _COUNT_LOCK:
+        total = _COUNT_CACHE.get("total")
+    if total is None:
+        total = vectorstore._collection.count()
+        with _COUNT_LOCK:
+            _COUNT_CACHE["total"] = total
+    return total
+
+
+def get_dimensions(vectorstore) -> int:
+    """Embedding width, read from a single stored vector once per process"""
+    global _DIMENSIONS
+    if _DIMENSIONS is None:
+        try:
+            sample = vectorstore._collection.peek(limit=1)["embeddings"]
+            if sample is not None and len(sample):
+                _DIMENSIONS = len(sample[0])
+        except Exception:
+            pass
+    return _DIMENSIONS or DEFAULT_DIMENSIONS
+
+
+def parse_non_negative_int(value: Optional[str], name: str) -> Optional[int]:
+    """Parse an optional paging query param; None when absent"""
+    if value is None or value == "":
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if number < 0:
+        raise ValueError(f"'{name}' must be >= 0")
+    return number
+
+
+def matches_search(row: Tuple[str, str, Dict[str, Any]], search_query: str) -> bool:
+    """Substring match on content preview, keywords and project reference"""
+    _, doc_content, doc_metadata = row
+    doc_metadata = doc_metadata or {}
+    return (
+        search_query in doc_content[:CONTENT_PREVIEW_CHARS].lower() or
+        search_query in doc_metadata.get("keywords", "").lower() or
+        search_query in doc_metadata.get("project_ref", "").lower()
+    )
+
+
+def serialize_vector(index: int, doc_id: str, doc_content: str, doc_metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """One listing row; metadata is projected onto the fixed frontend schema in one merge"""
+    metadata = {**METADATA_DEFAULTS, "chunk_id": index, **(doc_metadata or {})}
+    return {
+        "id": doc_id,
+        "index": index,
+        "content": doc_content[:CONTENT_PREVIEW_CHARS] + "..." if len(doc_content) > CONTENT_PREVIEW_CHARS else doc_content,
+        "full_content": doc_content,
+        "metadata": {key: metadata[key] for key in METADATA_FIELDS},
+    }
 
 class VectorStoreAPIView(APIView):
     """API to retrieve ALL vector store data with filtering"""
     
     def get(self, request):
         """GET all vectors with optional filtering"""
+        # Optional paging - without `limit` the full (filtered) listing is returned
+        try:
+            limit = parse_non_negative_int(request.query_params.get('limit'), 'limit')
+            offset = parse_non_negative_int(request.query_params.get('offset'), 'offset') or 0
+        except ValueError as e:
+            return Response({
+                "success": False,
+                "error": str(e),
+                "message": "Invalid paging parameters"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            # Load vectorstore
-            vectorstore = Chroma(
-                collection_name=COLLECTION_NAME,
-                embedding_function=embeddings,
-                persist_directory=str(CHROMA_DB_PATH),
-            )
-            
-            # Get ALL documents
-            all_docs = vectorstore.get()
-            
-            # Transform for frontend
-            vectors_data = []
-            for i, (doc_id, doc_content, doc_metadata) in enumerate(zip(
-                all_docs['ids'], 
-                all_docs['documents'], 
-                all_docs['metadatas']
-            )):
-                vectors_data.append({
-                    "id": doc_id,
-                    "index": i,
-                    "content": doc_content[:500] + "..." if len(doc_content) > 500 else doc_content,
-                    "full_content": doc_content,
-                    "metadata": {
-                        "category": doc_metadata.get("category", "unknown"),
-                        "sub_type": doc_metadata.get("sub_type", ""),
-                        "keywords": doc_metadata.get("keywords", ""),
-                        "project_ref": doc_metadata.get("project_ref", ""),
-                        "evidence_type": doc_metadata.get("evidence_type", ""),
-                        "taxonomy_score": doc_metadata.get("taxonomy_score", 1.0),
-                        "chunk_id": doc_metadata.get("chunk_id", i),
-                        "source": doc_metadata.get("source", ""),
-                        "created_at": doc_metadata.get("created_at", ""),
-                    }
-                })
-            
-            # Apply filters if provided
             category_filter = request.query_params.get('category')
             search_query = request.query_params.get('search', '').lower()
-            
-            filtered_data = vectors_data
-            
-            if category_filter:
-                filtered_data = [d for d in filtered_data if d["metadata"]["category"] == category_filter]
-            
+
+            vectorstore = get_vectorstore()
+
+            # ✅ Category filter is pushed down to Chroma - only matching rows are loaded.
+            # Without a text search the page window is pushed down as well.
+            page_in_storage = not search_query
+            docs = vectorstore.get(
+                where={"category": category_filter} if category_filter else None,
+                limit=limit if page_in_storage else None,
+                offset=offset if page_in_storage else None,
+                include=["documents", "metadatas"],
+            )
+
+            # Transform for frontend - only rows surviving the search filter are built
+            rows = enumerate(
+                zip(docs['ids'], docs['documents'], docs['metadatas']),
+                start=offset if page_in_storage else 0,
+            )
             if search_query:
-                filtered_data = [
-                    d for d in filtered_data 
-                    if (search_query in d["content"].lower() or 
-                        search_query in d["metadata"]["keywords"].lower() or
-                        search_query in d["metadata"]["project_ref"].lower())
-                ]
-            
-            # Get unique categories for filter dropdown
-            categories = list(set(d["metadata"]["category"] for d in vectors_data))
-            
+                rows = ((i, row) for i, row in rows if matches_search(row, search_query))
+                rows = islice(rows, offset, offset + limit if limit is not None else None)
+            filtered_data = [serialize_vector(i, *row) for i, row in rows]
+
+            total_vectors = get_total_count(vectorstore)
+
             return Response({
                 "success": True,
-                "total_vectors": len(vectors_data),
+                "total_vectors": total_vectors,
                 "filtered_count": len(filtered_data),
-                "categories": sorted(categories),
+                "categories": get_categories(vectorstore),
                 "data": filtered_data,
+                "limit": limit,
+                "offset": offset,
                 "vectorstore_stats": {
                     "collection": COLLECTION_NAME,
-                    "total_docs": len(all_docs['ids']),
-                    "dimensions": len(all_docs['embeddings'][0]) if all_docs['embeddings'] else 3072
+                    "total_docs": total_vectors,
+                    "dimensions": get_dimensions(vectorstore)
                 }
             })
             
@@ -112,11 +192,7 @@ class VectorSearchAPIView(APIView):
             if not query:
                 return Response({"error": "Query parameter 'q' required"}, status=400)
             
-            vectorstore = Chroma(
-                collection_name=COLLECTION_NAME,
-                embedding_function=embeddings,
-                persist_directory=str(CHROMA_DB_PATH),
-            )
+            vectorstore = get_vectorstore()
             
             retriever = vectorstore.as_retriever(search_kwargs={"k": k})
             docs = retriever.invoke(query)
@@ -142,17 +218,13 @@ class VectorSearchAPIView(APIView):
 def vector_data_json(request):
     """Quick JSON endpoint for testing"""
     try:
-        vectorstore = Chroma(
-            collection_name=COLLECTION_NAME,
-            embedding_function=embeddings,
-            persist_directory=str(CHROMA_DB_PATH),
-        )
-        all_docs = vectorstore.get()
+        vectorstore = get_vectorstore()
+        sample = vectorstore.get(limit=3, include=["documents"])
         
         data = {
-            "total": len(all_docs['ids']),
-            "categories": list(set(m.get("category") for m in all_docs['metadatas'])),
-            "sample": all_docs['documents'][:3]
+            "total": get_total_count(vectorstore),
+            "categories": get_categories(vectorstore),
+            "sample": sample['documents']
         }
         return JsonResponse(data)
     except: